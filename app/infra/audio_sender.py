@@ -0,0 +1,210 @@
+# infra/audio_sender.py
+"""Paced, backpressure-aware audio sender for WebSocket clients.
+
+Vendor TTS streams arrive in bursts that are often much faster than real time.
+Forwarding them straight to `websocket.send_bytes` lets a slow client grow the
+server-side send buffers without bound. `AudioSender` sits in between:
+
+* the first chunk is kept small so playback can start quickly;
+* later chunks are re-sliced to a fixed size and paced near real time (at the
+  stream's own byte rate, starting from the first send), with a small lead so
+  the client never starves;
+* vendor bytes wait in a bounded per-connection buffer – if no chunk reaches
+  the client for longer than the stall timeout (or a single send hangs that
+  long), the client is considered stuck and `ClientStalledError` is raised.
+
+`buffer_stats()` reports aggregate buffer usage across live sessions; session
+ids are never exposed since they grant access to a conversation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import AsyncIterator, Dict
+
+from fastapi import WebSocket  # type: ignore
+
+from app.infra.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Live senders keyed by session id (used for buffer reporting)
+_SENDERS: Dict[str, "AudioSender"] = {}
+
+
+class ClientStalledError(Exception):
+    """Raised when a client cannot keep up with the audio stream."""
+
+
+def buffer_stats() -> Dict[str, int]:
+    """Return session count, total and max buffered bytes for live senders."""
+
+    sizes = [sender.buffered for sender in _SENDERS.values()]
+    return {
+        "sessions": len(sizes),
+        "total_bytes": sum(sizes),
+        "max_bytes": max(sizes, default=0),
+    }
+
+
+class AudioSender:
+    """Per-connection audio scheduler; create once per WebSocket."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        session_id: str,
+        *,
+        first_chunk_bytes: int | None = None,
+        chunk_bytes: int | None = None,
+        lead_seconds: float | None = None,
+        max_buffer_bytes: int | None = None,
+        stall_timeout: float | None = None,
+    ):
+        self.websocket = websocket
+        self.session_id = session_id
+        self.first_chunk_bytes = first_chunk_bytes or settings.audio_first_chunk_bytes
+        self.chunk_bytes = chunk_bytes or settings.audio_chunk_bytes
+        self.lead_seconds = (
+            lead_seconds if lead_seconds is not None else settings.audio_lead_seconds
+        )
+        self.max_buffer_bytes = max(
+            max_buffer_bytes or settings.audio_max_buffer_bytes, self.chunk_bytes
+        )
+        self.stall_timeout = stall_timeout or settings.audio_stall_timeout
+
+        self._buf = bytearray()
+        self._cond = asyncio.Condition()
+        self._eof = False
+        self._sender_done = False
+        self._last_progress = 0.0
+
+        _SENDERS[session_id] = self
+
+    @property
+    def buffered(self) -> int:
+        """Bytes received from the vendor but not yet sent to the client."""
+
+        return len(self._buf)
+
+    def close(self) -> None:
+        """Stop reporting this sender; call when the WebSocket goes away."""
+
+        if _SENDERS.get(self.session_id) is self:
+            del _SENDERS[self.session_id]
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    async def stream(self, byte_iter: AsyncIterator[bytes], *, bytes_per_sec: int) -> int:
+        """Forward *byte_iter* to the client with pacing; return bytes sent.
+
+        *bytes_per_sec* is the playback rate of this stream's encoding (e.g.
+        `tts.output_format()["bytes_per_sec"]`). *byte_iter* is closed before
+        returning. Raises `ClientStalledError` if the client falls too far
+        behind.
+        """
+
+        self._buf.clear()
+        self._eof = False
+        self._sender_done = False
+        self._last_progress = asyncio.get_running_loop().time()
+        sender = asyncio.create_task(self._send_loop(bytes_per_sec))
+
+        try:
+            async for chunk in byte_iter:
+                if not chunk:
+                    continue
+                async with self._cond:
+                    await self._wait(
+                        lambda: self._sender_done
+                        or len(self._buf) + len(chunk) <= self.max_buffer_bytes
+                        or not self._buf
+                    )
+                    if self._sender_done:
+                        break
+                    self._buf.extend(chunk)
+                    self._cond.notify_all()
+        except BaseException:
+            sender.cancel()
+            raise
+        finally:
+            async with self._cond:
+                self._eof = True
+                self._cond.notify_all()
+            # Release the vendor connection now rather than at garbage collection.
+            aclose = getattr(byte_iter, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+        return await sender
+
+    # ------------------------------------------------------------------ #
+    # Internals
+    # ------------------------------------------------------------------ #
+    async def _wait(self, predicate) -> None:
+        """`Condition.wait_for` that fails once sends stop making progress.
+
+        Waiting on a paced sender is normal; only a gap of `stall_timeout`
+        since the last successful send counts as a stall (lock held).
+        """
+
+        loop = asyncio.get_running_loop()
+        while not predicate():
+            remaining = self._last_progress + self.stall_timeout - loop.time()
+            if remaining <= 0:
+                logger.warning(
+                    "No audio sent for %.1fs (session=%s, buffered=%d) – dropping client",
+                    self.stall_timeout,
+                    self.session_id,
+                    len(self._buf),
+                )
+                raise ClientStalledError("client not draining audio")
+            try:
+                await asyncio.wait_for(self._cond.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send_loop(self, bytes_per_sec: int) -> int:
+        loop = asyncio.get_running_loop()
+        lead_bytes = int(self.lead_seconds * bytes_per_sec)
+        start = 0.0
+        sent = 0
+        try:
+            while True:
+                size = self.first_chunk_bytes if sent == 0 else self.chunk_bytes
+                async with self._cond:
+                    await self._cond.wait_for(lambda: self._eof or len(self._buf) >= size)
+                    if not self._buf:
+                        return sent
+                    piece = bytes(self._buf[:size])
+                    del self._buf[:size]
+                    self._cond.notify_all()
+
+                # Playback starts with the first chunk; stay at most
+                # `lead_bytes` ahead of it.
+                if sent == 0:
+                    start = loop.time()
+                due = start + max(0, sent - lead_bytes) / bytes_per_sec
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                try:
+                    await asyncio.wait_for(
+                        self.websocket.send_bytes(piece), self.stall_timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(
+                        "Audio send blocked for %.1fs (session=%s) – dropping client",
+                        self.stall_timeout,
+                        self.session_id,
+                    )
+                    raise ClientStalledError("client not reading audio") from None
+                sent += len(piece)
+                self._last_progress = loop.time()
+        finally:
+            async with self._cond:
+                self._sender_done = True
+                self._cond.notify_all()
@@ -42,6 +42,26 @@ settings = SimpleNamespace(
 
     # Feature toggles
     use_deepgram=os.getenv("USE_DEEPGRAM", "False").lower() == "true",
+
+    # WebSocket audio pacing (see app/infra/audio_sender.py)
+    audio_first_chunk_bytes=int(_env("AUDIO_FIRST_CHUNK_BYTES", "1024")),
+    audio_chunk_bytes=int(_env("AUDIO_CHUNK_BYTES", "4096")),
+    audio_lead_seconds=float(_env("AUDIO_LEAD_SECONDS", "1.0")),
+    audio_max_buffer_bytes=int(_env("AUDIO_MAX_BUFFER_BYTES", "262144")),
+    audio_stall_timeout=float(_env("AUDIO_STALL_TIMEOUT", "5.0")),
+
+    # STT/TTS vendor circuit breakers (see app/infra/vendor_health.py)
+    vendor_window=int(_env("VENDOR_WINDOW", "20")),
+    vendor_min_calls=int(_env("VENDOR_MIN_CALLS", "5")),
+    vendor_failure_ratio=float(_env("VENDOR_FAILURE_RATIO", "0.5")),
+    vendor_max_consecutive_failures=int(_env("VENDOR_MAX_CONSECUTIVE_FAILURES", "3")),
+    vendor_cooldown=float(_env("VENDOR_COOLDOWN", "30")),
+    vendor_sample_ttl=float(_env("VENDOR_SAMPLE_TTL", "300")),
+    vendor_explore_ratio=float(_env("VENDOR_EXPLORE_RATIO", "0.05")),
+    stt_timeout=float(_env("STT_TIMEOUT", "15")),
+    tts_first_byte_timeout=float(_env("TTS_FIRST_BYTE_TIMEOUT", "5")),
+    tts_chunk_timeout=float(_env("TTS_CHUNK_TIMEOUT", "10")),
+    tts_slow_seconds=float(_env("TTS_SLOW_SECONDS", "1.5")),
 )
 
 
@@ -0,0 +1,256 @@
+# infra/vendor_health.py
+"""Latency-scored circuit breakers for the STT and TTS vendors.
+
+Every vendor call is timed and recorded on a `CircuitBreaker` keyed by
+`(kind, vendor)` – e.g. `("tts", "deepgram")`. Each breaker keeps a rolling
+window of recent calls (samples older than `VENDOR_SAMPLE_TTL` are ignored) and
+opens when the vendor degrades:
+
+* `VENDOR_MAX_CONSECUTIVE_FAILURES` errors in a row, or
+* at least `VENDOR_MIN_CALLS` samples of which `VENDOR_FAILURE_RATIO` or more
+  were errors – or, if the kind has a "slow" threshold and the vendor has an
+  alternative in its pool, slower than it.
+
+An open breaker is skipped until `VENDOR_COOLDOWN` seconds have passed; it then
+goes half-open and lets a single probe call through. A successful (and, with a
+threshold, fast) probe closes it again, anything else re-opens it.
+
+`candidates()` yields the vendors to try for one call: due probes first, then
+closed breakers by p90 latency, failures counting as infinitely slow. Vendors
+without a score keep the configured preference order, so a never-used vendor
+only sees failover traffic. A `VENDOR_EXPLORE_RATIO` share of calls goes to a
+previously used vendor that has fallen behind, so its score stays current. If
+every circuit is open, the least-bad vendor is still tried:
+
+    for br, is_last in vendor_health.candidates("stt", vendors):
+        ...  # call vendor, then br.record_success(latency) / br.record_failure()
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Tuple
+
+from app.infra.config import settings
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Breakers keyed by (kind, vendor)
+_BREAKERS: Dict[Tuple[str, str], "CircuitBreaker"] = {}
+
+
+class VendorUnavailableError(Exception):
+    """Raised when no healthy vendor is left to serve a call."""
+
+
+class CircuitBreaker:
+    """Rolling latency/error stats and circuit state for one vendor."""
+
+    def __init__(self, kind: str, vendor: str, *, slow_seconds: float | None = None):
+        self.kind = kind
+        self.vendor = vendor
+        self.slow_seconds = slow_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.last_call_at = 0.0
+        self.consecutive_failures = 0
+        # (timestamp, ok, latency) – latency is None for failures
+        self._calls: Deque[Tuple[float, bool, float | None]] = deque(
+            maxlen=settings.vendor_window
+        )
+        self._probe_in_flight = False
+
+    # ------------------------------------------------------------------ #
+    # Stats
+    # ------------------------------------------------------------------ #
+    def _recent(self) -> List[Tuple[bool, float | None]]:
+        cutoff = time.monotonic() - settings.vendor_sample_ttl
+        return [(ok, lat) for ts, ok, lat in self._calls if ts >= cutoff]
+
+    @property
+    def score(self) -> float:
+        """p90 latency of recent calls, failures counting as infinite.
+
+        Infinite too when there are no recent calls.
+        """
+
+        latencies = sorted(lat if ok else float("inf") for ok, lat in self._recent())
+        if not latencies:
+            return float("inf")
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))]
+
+    @property
+    def error_ratio(self) -> float:
+        """Share of recent calls that failed (or were slow, with a threshold)."""
+
+        calls = self._recent()
+        if not calls:
+            return 0.0
+        bad = sum(1 for ok, lat in calls if not ok or self._is_slow(lat))
+        return bad / len(calls)
+
+    def _is_slow(self, latency: float | None) -> bool:
+        if self.slow_seconds is None or latency is None:
+            return False
+        return latency > self.slow_seconds
+
+    def snapshot(self) -> dict:
+        score = self.score
+        return {
+            "state": self.state,
+            "calls": len(self._recent()),
+            "p90_latency": round(score, 3) if score != float("inf") else None,
+            "error_ratio": round(self.error_ratio, 3),
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+    # ------------------------------------------------------------------ #
+    # State machine
+    # ------------------------------------------------------------------ #
+    def probe_due(self) -> bool:
+        if self.state == OPEN:
+            return time.monotonic() - self.opened_at >= settings.vendor_cooldown
+        return self.state == HALF_OPEN and not self._probe_in_flight
+
+    def acquire(self, *, force: bool = False) -> bool:
+        """Return True if a call may go to this vendor now.
+
+        `force` admits the call as a probe even before the cooldown is over.
+        """
+
+        if self.state == CLOSED:
+            return True
+        if not force and not self.probe_due():
+            return False
+        self.state = HALF_OPEN
+        self._probe_in_flight = True
+        return True
+
+    def release(self) -> None:
+        """Give back an acquired call without recording an outcome."""
+
+        self._probe_in_flight = False
+
+    def record_success(self, latency: float) -> None:
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        if self.state == HALF_OPEN:
+            if self._is_slow(latency):
+                self._open()
+                return
+            self.state = CLOSED
+            self._calls.clear()
+        self._append(True, latency)
+        self._check()
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        self._append(False, None)
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self._check()
+
+    def _append(self, ok: bool, latency: float | None) -> None:
+        self.last_call_at = time.monotonic()
+        self._calls.append((self.last_call_at, ok, latency))
+
+    def _check(self) -> None:
+        if self.state != CLOSED:
+            return
+        calls = self._recent()
+        if self.consecutive_failures >= settings.vendor_max_consecutive_failures or (
+            len(calls) >= settings.vendor_min_calls
+            and self.error_ratio >= settings.vendor_failure_ratio
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+
+# ---------------------------------------------------------------------------
+# Module helpers
+# ---------------------------------------------------------------------------
+def available_vendors() -> List[str]:
+    """Enabled vendors, preferred first.
+
+    Deepgram is opt-in: it is only used with `USE_DEEPGRAM=true` and an API
+    key, and OpenAI then acts as its fallback.
+    """
+
+    if settings.use_deepgram and settings.deepgram_api_key:
+        return ["deepgram", "openai"]
+    return ["openai"]
+
+
+def get_breaker(
+    kind: str, vendor: str, *, slow_seconds: float | None = None
+) -> CircuitBreaker:
+    key = (kind, vendor)
+    if key not in _BREAKERS:
+        _BREAKERS[key] = CircuitBreaker(kind, vendor, slow_seconds=slow_seconds)
+    return _BREAKERS[key]
+
+
+def route(
+    kind: str, vendors: List[str], *, slow_seconds: float | None = None
+) -> List[CircuitBreaker]:
+    """Return breakers to try for one call, best first (open ones skipped)."""
+
+    breakers = [get_breaker(kind, v) for v in vendors]
+    # Slowness alone must never take out the only vendor of a pool.
+    for br in breakers:
+        br.slow_seconds = slow_seconds if len(breakers) > 1 else None
+
+    probes = [br for br in breakers if br.state != CLOSED and br.probe_due()]
+    # sorted() is stable, so unscored (infinite) vendors keep preference order
+    closed = sorted((br for br in breakers if br.state == CLOSED), key=lambda br: br.score)
+
+    # Re-measure a vendor that has fallen behind now and then, so it can win
+    # its place back once it recovers.
+    behind = [br for br in closed[1:] if br.last_call_at]
+    if behind and random.random() < settings.vendor_explore_ratio:
+        pick = random.choice(behind)
+        closed.remove(pick)
+        closed.insert(0, pick)
+    return probes + closed
+
+
+def candidates(
+    kind: str, vendors: List[str], *, slow_seconds: float | None = None
+) -> Iterator[Tuple[CircuitBreaker, bool]]:
+    """Acquire and yield `(breaker, is_last)` for one call, best first.
+
+    If no circuit admits the call, the least-bad vendor is forced through as
+    a probe rather than failing outright.
+    """
+
+    ordered = route(kind, vendors, slow_seconds=slow_seconds)
+    yielded = False
+    for i, br in enumerate(ordered):
+        if br.acquire():
+            yielded = True
+            yield br, i == len(ordered) - 1
+    if not yielded:
+        br = min(
+            (get_breaker(kind, v) for v in vendors),
+            key=lambda b: (b.error_ratio, b.score),
+        )
+        br.acquire(force=True)
+        yield br, True
+
+
+def snapshot() -> Dict[str, Dict[str, dict]]:
+    """Return `{kind: {vendor: stats}}` for every breaker seen so far."""
+
+    out: Dict[str, Dict[str, dict]] = {}
+    for (kind, vendor), br in _BREAKERS.items():
+        out.setdefault(kind, {})[vendor] = br.snapshot()
+    return out
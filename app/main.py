@@ -29,6 +29,7 @@ def _get_history(session_id: str) -> List[dict]:
 
 # Import settings to ensure env vars are populated
 from app.infra.config import settings  # noqa: E402  pylint: disable=wrong-import-position
+from app.infra import vendor_health  # noqa: E402
 
 # Persist uploaded audio under /tmp in Vercel (read-only filesystem elsewhere) or ./data locally
 if os.environ.get("VERCEL"):
@@ -151,20 +152,18 @@ async def tts_stream(body: dict):
     if not text:
         raise HTTPException(400, detail="`text` field missing")
 
-    async def _gen():
-        if settings.use_deepgram and settings.deepgram_api_key:
-            async for chunk in tts.synthesize_stream_deepgram(text):
-                yield chunk
-        else:
-            async for chunk in tts.synthesize_stream(text):
-                yield chunk
-
+    fmt = tts.output_format()
     return StreamingResponse(
-        _gen(),
-        media_type="audio/mpeg",
-        headers={"Content-Disposition": "inline; filename=reply.mp3"},
+        tts.synthesize_stream(text),
+        media_type=fmt["media_type"],
+        headers={"Content-Disposition": f"inline; filename=reply.{fmt['ext']}"},
     )
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/health/vendors")
+def vendor_health_check():
+    """Circuit state and rolling latency/error stats per STT/TTS vendor."""
+    return vendor_health.snapshot()
\ No newline at end of file
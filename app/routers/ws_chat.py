@@ -11,6 +11,7 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query  # type: ig
 from app.services import chat, stt, tts
 from app.services.chat import THERAPIST_SYSTEM_PROMPT
 from app.infra.config import settings  # reuse existing settings helper
+from app.infra.audio_sender import AudioSender, ClientStalledError, buffer_stats
 
 # ---------------- Logging setup (prod config) ----------------
 logger = logging.getLogger(__name__)
@@ -87,18 +88,20 @@ async def _receive_full_utterance(websocket: WebSocket) -> bytearray:
             return buf  # utterance finished
 
 
-async def _stream_tts_audio(websocket: WebSocket, text: str):
-    """Stream TTS bytes and send AUDIO_END when finished."""
+async def _stream_tts_audio(websocket: WebSocket, sender: AudioSender, text: str):
+    """Stream paced TTS bytes via *sender* and send AUDIO_END when finished."""
+    stalled = False
     try:
-        if settings.use_deepgram and settings.deepgram_api_key:
-            byte_iter = tts.synthesize_stream_deepgram(text)
-        else:
-            byte_iter = tts.synthesize_stream(text)
-
-        async for chunk in byte_iter:
-            await websocket.send_bytes(chunk)
+        await sender.stream(
+            tts.synthesize_stream(text),
+            bytes_per_sec=tts.output_format()["bytes_per_sec"],
+        )
+    except ClientStalledError:
+        stalled = True
+        raise
     finally:
-        await websocket.send_json({"type": SERVER["AUDIO_END"]})
+        if not stalled:
+            await websocket.send_json({"type": SERVER["AUDIO_END"]})
 
 
 async def _send_assistant_text(websocket: WebSocket, text: str, *, partial: bool):
@@ -124,6 +127,7 @@ async def websocket_chat_v2(
     await websocket.accept()
     sid = session_id or str(uuid.uuid4())
     history = _get_history(sid)
+    sender = AudioSender(websocket, sid)
     turn_counter = 0  # increment each user utterance
 
     try:
@@ -157,7 +161,7 @@ async def websocket_chat_v2(
             history.append({"role": "assistant", "content": assistant_text_full})
 
             # 4. Stream TTS audio -------------------------------------------
-            await _stream_tts_audio(websocket, assistant_text_full)
+            await _stream_tts_audio(websocket, sender, assistant_text_full)
 
             recording_buf.clear()
             turn_counter += 1  # prep for next turn
@@ -165,6 +169,21 @@ async def websocket_chat_v2(
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected by client")
         return
+    except ClientStalledError as exc:
+        logger.warning("Dropping slow client (session=%s): %s", sid, exc)
+        try:
+            await websocket.close(code=1013, reason="client too slow")
+        except Exception:  # pragma: no cover – socket already broken
+            pass
+        return
     except Exception as exc:  # pragma: no cover
         logger.exception("Unhandled error in chat_v2 handler: %s", exc)
-        return 
\ No newline at end of file
+        return
+    finally:
+        sender.close()
+
+
+@router.get("/ws/audio_buffers")
+def audio_buffers():
+    """Report aggregate audio buffer usage across live WebSocket sessions."""
+    return buffer_stats() 
\ No newline at end of file
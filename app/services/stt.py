@@ -1,13 +1,16 @@
 """Service – Speech-to-text helper (Whisper)."""
 
 import asyncio
+import logging
 import os
+import time
 from pathlib import Path
 import uuid
 
 from litellm import transcription  # type: ignore
 from deepgram import DeepgramClient, PrerecordedOptions  # type: ignore
 from app.infra.config import settings
+from app.infra import vendor_health
 
 import json
 
@@ -23,42 +26,75 @@ def _ensure_deepgram_client() -> DeepgramClient:
         deepgram = DeepgramClient(settings.deepgram_api_key)
     return deepgram
 
+def _sync_run_deepgram(file_path: str, model: str) -> str:
+    """Transcribe *file_path* with Deepgram (blocking)."""
+
+    dg = _ensure_deepgram_client()
+    with open(file_path, "rb") as buffer_data:
+        payload = {"buffer": buffer_data}
+        options = PrerecordedOptions(
+            smart_format=True,
+            model="nova-2",
+            language="en-US",
+        )
+        response = dg.listen.prerecorded.v("1").transcribe_file(payload, options)
+        dg_resp = json.loads(response.to_json(indent=4))
+        return (
+            dg_resp.get("results", {})
+            .get("channels", [{}])[0]
+            .get("alternatives", [{}])[0]
+            .get("transcript", "")
+        )
+
+
+def _sync_run_whisper(file_path: str, model: str) -> str:
+    """Transcribe *file_path* with OpenAI Whisper via LiteLLM (blocking)."""
+
+    with open(file_path, "rb") as audio_file:
+        resp = transcription(model=model, file=audio_file)
+        return resp.get("text", "").strip()
+
+
 async def transcribe_file(file_path: str, model: str = "whisper-1") -> str:
     """Transcribe an audio file already persisted on disk.
 
-    If `settings.use_deepgram` is **truthy** and the Deepgram API key is set, the
-    audio is sent to Deepgram; otherwise it falls back to OpenAI Whisper via
-    `litellm.transcription`.
+    OpenAI Whisper (via `litellm.transcription`) is used unless
+    `settings.use_deepgram` is set with a Deepgram API key; then Deepgram is
+    preferred and Whisper is its fallback, and calls go to the fastest healthy
+    one. A vendor that errors or exceeds `settings.stt_timeout` is recorded as
+    a failure and the next one is tried; if every circuit is open the
+    least-bad vendor is still tried before `VendorUnavailableError` is raised.
+    Only failures open a vendor's circuit: transcription time grows with
+    utterance length, so latency is used for ranking only.
+
+    The timeout stops *waiting*, not the work – the executor thread of a
+    timed-out call keeps running until the vendor returns.
     """
 
-    def _sync_run_deepgram() -> str:
-        dg = _ensure_deepgram_client()
-        with open(file_path, "rb") as buffer_data:
-            payload = {"buffer": buffer_data}
-            options = PrerecordedOptions(
-                smart_format=True,
-                model="nova-2",
-                language="en-US",
-            )
-            response = dg.listen.prerecorded.v("1").transcribe_file(payload, options)
-            dg_resp = json.loads(response.to_json(indent=4))
-            return (
-                dg_resp.get("results", {})
-                .get("channels", [{}])[0]
-                .get("alternatives", [{}])[0]
-                .get("transcript", "")
-            )
-
-    def _sync_run_whisper() -> str:
-        with open(file_path, "rb") as audio_file:
-            resp = transcription(model=model, file=audio_file)
-            return resp.get("text", "").strip()
+    runners = {"deepgram": _sync_run_deepgram, "openai": _sync_run_whisper}
+    vendors = vendor_health.available_vendors()
 
     loop = asyncio.get_event_loop()
-    if settings.use_deepgram and settings.deepgram_api_key:
-        return await loop.run_in_executor(None, _sync_run_deepgram)
-    else:
-        return await loop.run_in_executor(None, _sync_run_whisper) 
+    last_exc: Exception | None = None
+    for br, _ in vendor_health.candidates("stt", vendors):
+        start = time.monotonic()
+        try:
+            text = await asyncio.wait_for(
+                loop.run_in_executor(None, runners[br.vendor], file_path, model),
+                settings.stt_timeout,
+            )
+        except Exception as exc:
+            br.record_failure()
+            logging.warning("STT vendor %s failed: %r", br.vendor, exc)
+            last_exc = exc
+            continue
+        except BaseException:
+            br.release()
+            raise
+        br.record_success(time.monotonic() - start)
+        return text
+
+    raise vendor_health.VendorUnavailableError("no healthy STT vendor") from last_exc
 
 
 # ---------------------------------------------------------------------------
@@ -5,10 +5,13 @@ from __future__ import annotations
 import tempfile
 from pathlib import Path
 import asyncio
+import logging
+import time
 from openai import AsyncOpenAI
 import requests
 
 from app.infra.config import settings
+from app.infra import vendor_health
 from deepgram import (
     DeepgramClient,
     SpeakWebSocketEvents,
@@ -29,6 +32,25 @@ def _ensure_deepgram_client() -> DeepgramClient:
     return deepgram
 
 
+# Both vendors are asked for the same encoding so either can serve any call:
+# raw 16-bit signed little-endian PCM, 24 kHz mono.
+TTS_SAMPLE_RATE = 24000
+TTS_FORMAT = {
+    "media_type": f"audio/pcm;rate={TTS_SAMPLE_RATE};channels=1",
+    "ext": "pcm",
+    "bytes_per_sec": TTS_SAMPLE_RATE * 2,
+}
+
+# Marks the end of a Deepgram stream on its hand-off queue
+_STREAM_END = object()
+
+
+def output_format() -> dict:
+    """Format of the audio `synthesize_stream` yields (see `TTS_FORMAT`)."""
+
+    return TTS_FORMAT
+
+
 async def synthesize_stream(
     text: str,
     *,
@@ -37,82 +59,143 @@ async def synthesize_stream(
     chunk_size: int | None = None,
     **optional_params,
 ):
-    """Yield audio bytes incrementally."""
-    # If Deepgram usage is enabled, delegate to the Deepgram helper.
-    if settings.use_deepgram and settings.deepgram_api_key:
-        async for chunk in synthesize_stream_deepgram(
-            text,
-            chunk_size=chunk_size,
-            **optional_params,
-        ):
-            yield chunk
-        return
-    instructions = """Voice: Soft, calm, and empathetic, with a gentle, steady cadence that fosters safety and trust.\n\nTone: Compassionate, non-judgmental, and reflective, encouraging self-exploration and validating the speaker’s feelings.\n\nDialect: Neutral and professional, free of jargon while remaining warm and approachable.\n\nPronunciation: Gentle and clear, allowing comfortable pauses for reflection and using soothing intonation.\n\nFeatures: Employs reflective listening, affirmations, open-ended questions, and gentle prompts that support emotional expression and insight."""
-    try:
-        async with client.audio.speech.with_streaming_response.create(
-            model=model,
-            voice=voice,
-            input=text,
-            instructions=instructions,
-            response_format="mp3",
-            **optional_params,
-        ) as resp:
-            async for chunk in resp.iter_bytes(chunk_size=chunk_size or 4096):
+    """Yield audio bytes incrementally from the fastest healthy TTS vendor.
+
+    Every vendor yields `TTS_FORMAT` audio; they are scored on
+    time-to-first-byte. One that errors, yields nothing or
+    misses `settings.tts_first_byte_timeout` is recorded as a failure and the
+    next is tried. The last candidate gets `settings.tts_chunk_timeout`
+    instead, so a slow but working vendor still answers. Once audio has started there is no failover: a mid-stream
+    error, or a gap longer than `settings.tts_chunk_timeout`, is recorded as a
+    failure and just ends the stream.
+    """
+    streams = {
+        "openai": lambda: synthesize_stream_openai(
+            text, model=model, voice=voice, chunk_size=chunk_size, **optional_params
+        ),
+        "deepgram": lambda: synthesize_stream_deepgram(
+            text, chunk_size=chunk_size, **optional_params
+        ),
+    }
+    vendors = vendor_health.available_vendors()
+
+    for br, is_last in vendor_health.candidates(
+        "tts", vendors, slow_seconds=settings.tts_slow_seconds
+    ):
+        byte_iter = streams[br.vendor]()
+        timeout = settings.tts_chunk_timeout if is_last else settings.tts_first_byte_timeout
+        start = time.monotonic()
+        try:
+            first = await asyncio.wait_for(byte_iter.__anext__(), timeout)
+        except Exception as exc:  # includes StopAsyncIteration / TimeoutError
+            br.record_failure()
+            logging.warning("TTS vendor %s failed before audio: %r", br.vendor, exc)
+            await byte_iter.aclose()
+            continue
+        except BaseException:
+            br.release()
+            await byte_iter.aclose()
+            raise
+
+        latency = time.monotonic() - start
+        failed = False
+        try:
+            yield first
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        byte_iter.__anext__(), settings.tts_chunk_timeout
+                    )
+                except StopAsyncIteration:
+                    break
                 yield chunk
-            return
-    except Exception as exc:  # pragma: no cover – network issues
-        import logging
+        except Exception as exc:  # includes TimeoutError between chunks
+            failed = True
+            logging.warning("TTS vendor %s failed mid-stream: %r", br.vendor, exc)
+        finally:
+            if failed:
+                br.record_failure()
+            else:
+                br.record_success(latency)
+            await byte_iter.aclose()
+        return
+
+    logging.warning("TTS unavailable – no healthy vendor, returning no audio")
+
 
-        logging.warning("TTS streaming failed, fallback: %s", exc)
+async def synthesize_stream_openai(
+    text: str,
+    *,
+    model: str = "gpt-4o-mini-tts",
+    voice: str = "nova",
+    chunk_size: int | None = None,
+    **optional_params,
+):
+    """Stream TTS audio (`TTS_FORMAT` PCM) from OpenAI; errors propagate."""
+    instructions = """Voice: Soft, calm, and empathetic, with a gentle, steady cadence that fosters safety and trust.\n\nTone: Compassionate, non-judgmental, and reflective, encouraging self-exploration and validating the speaker’s feelings.\n\nDialect: Neutral and professional, free of jargon while remaining warm and approachable.\n\nPronunciation: Gentle and clear, allowing comfortable pauses for reflection and using soothing intonation.\n\nFeatures: Employs reflective listening, affirmations, open-ended questions, and gentle prompts that support emotional expression and insight."""
+    async with client.audio.speech.with_streaming_response.create(
+        model=model,
+        voice=voice,
+        input=text,
+        instructions=instructions,
+        response_format="pcm",
+        **optional_params,
+    ) as resp:
+        async for chunk in resp.iter_bytes(chunk_size=chunk_size or 4096):
+            yield chunk
 
 # --------------------------------------------------------------------------- #
-# Deepgram TTS – stream bytes directly from the Deepgram “/v1/speak” endpoint #
+# Deepgram TTS – stream bytes from the Deepgram speak WebSocket                #
 # --------------------------------------------------------------------------- #
-# Issues with streaming
 async def synthesize_stream_deepgram(
     text: str,
     *,
-    model: str = "aura-asteria-en",   # Deepgram Aura voice model
-    encoding: str = "mp3",            # mp3, wav, flac, etc.
-    sample_rate: int | None = 24000,   # 24 kHz recommended for Aura voices
+    model: str = "aura-2-thalia-en",  # Deepgram Aura voice model
     chunk_size: int | None = None,
     **optional_params,
 ):
     """Stream TTS audio from Deepgram.
 
-    This opens an HTTP chunked stream to Deepgram’s `/v1/speak` endpoint and
-    yields raw audio bytes so callers can forward them to the client
+    This opens a Deepgram speak WebSocket and yields raw linear16 PCM (see
+    `TTS_FORMAT`) until Deepgram reports the text as flushed. SDK callbacks
+    run on Deepgram's own threads, so they hand data to the event loop with
+    `call_soon_threadsafe`.
     """
-    queue = asyncio.Queue()
-    done = asyncio.Event()
-    dg= _ensure_deepgram_client()
-    dg_connection = dg.speak.websocket.v("1")
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
     def on_binary_data(self, data, **kwargs):
-        try:
-            print("Received binary data")
-            queue.put_nowait(data) 
-        except asyncio.QueueFull:
-            pass  # drop or handle overflow if needed
+        loop.call_soon_threadsafe(queue.put_nowait, data)
+
+    def on_done(self, *args, **kwargs):
+        loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
+
+    def on_error(self, error=None, **kwargs):
+        loop.call_soon_threadsafe(
+            queue.put_nowait, RuntimeError(f"Deepgram TTS error: {error}")
+        )
 
-    def on_close(self, *args, **kwargs):
-        done.set()
+    dg = _ensure_deepgram_client()
+    dg_connection = dg.speak.websocket.v("1")
     dg_connection.on(SpeakWebSocketEvents.AudioData, on_binary_data)
-    dg_connection.on(SpeakWebSocketEvents.Close, on_close)
+    dg_connection.on(SpeakWebSocketEvents.Flushed, on_done)
+    dg_connection.on(SpeakWebSocketEvents.Close, on_done)
+    dg_connection.on(SpeakWebSocketEvents.Error, on_error)
     options = SpeakWSOptions(
-            model="aura-2-thalia-en",
-            encoding="linear16",
-            sample_rate=16000,
-        )
-    if dg_connection.start(options) is False:
-        print("Failed to start connection")
-        return
-        # send the text to Deepgram
-    dg_connection.send_text(text)
-        # if auto_flush_speak_delta is not used, you must flush the connection by calling flush()
-    dg_connection.flush()
-    dg_connection.finish()
-    while not done.is_set() or not queue.empty():
-        chunk = await queue.get()
-        print("Received chunk data", chunk)
-        yield chunk 
-   
\ No newline at end of file
+        model=model,
+        encoding="linear16",
+        sample_rate=TTS_SAMPLE_RATE,
+    )
+    # start()/finish() block on network I/O and thread joins
+    if await loop.run_in_executor(None, dg_connection.start, options) is False:
+        raise RuntimeError("Deepgram TTS connection failed to start")
+    try:
+        dg_connection.send_text(text)
+        # without auto_flush_speak_delta we must flush to get the audio back
+        dg_connection.flush()
+        while (item := await queue.get()) is not _STREAM_END:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        await loop.run_in_executor(None, dg_connection.finish)
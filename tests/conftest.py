@@ -0,0 +1,37 @@
+"""Shared pytest setup."""
+
+import os
+
+import pytest
+
+# Use LiteLLM's bundled model cost map instead of fetching it on import.
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from app.infra import vendor_health  # noqa: E402
+from app.infra.config import settings  # noqa: E402
+
+
+@pytest.fixture
+def both_vendors(monkeypatch):
+    """Fresh breakers with Deepgram preferred and OpenAI as fallback."""
+
+    monkeypatch.setattr(vendor_health, "_BREAKERS", {})
+    monkeypatch.setattr(settings, "use_deepgram", True)
+    monkeypatch.setattr(settings, "deepgram_api_key", "dg-key")
+    monkeypatch.setattr(settings, "vendor_explore_ratio", 0.0)
+    monkeypatch.setattr(settings, "vendor_cooldown", 30.0)
+    monkeypatch.setattr(settings, "vendor_max_consecutive_failures", 3)
+
+
+@pytest.fixture
+def open_breaker():
+    """Return a helper that drives a breaker to OPEN."""
+
+    def _open(kind: str, vendor: str):
+        br = vendor_health.get_breaker(kind, vendor)
+        for _ in range(settings.vendor_max_consecutive_failures):
+            br.record_failure()
+        assert br.state == vendor_health.OPEN
+        return br
+
+    return _open
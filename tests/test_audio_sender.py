@@ -0,0 +1,197 @@
+"""Tests for the paced WebSocket audio sender."""
+
+import asyncio
+
+import pytest
+
+from app.infra.audio_sender import AudioSender, ClientStalledError, buffer_stats
+
+_real_sleep = asyncio.sleep
+
+
+class VirtualClock:
+    """Loop time that only moves when code sleeps, so pacing is exact."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    async def sleep(self, delay, result=None):
+        self.now += max(delay, 0)
+        await _real_sleep(0)
+        return result
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = VirtualClock()
+    monkeypatch.setattr(asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def run_virtual(clock, coro_fn):
+    async def main():
+        asyncio.get_running_loop().time = clock.time
+        return await coro_fn()
+
+    return asyncio.run(main())
+
+
+class FakeWebSocket:
+    """Records `(loop_time, size)` per send; optionally never returns."""
+
+    def __init__(self, *, hang: bool = False):
+        self.sends: list[tuple[float, int]] = []
+        self.hang = hang
+
+    async def send_bytes(self, data: bytes):
+        if self.hang:
+            await asyncio.get_running_loop().create_future()
+        self.sends.append((asyncio.get_running_loop().time(), len(data)))
+
+
+async def _vendor(chunks, *, delay: float = 0.0, closed: list | None = None):
+    try:
+        if delay:
+            await asyncio.sleep(delay)
+        for chunk in chunks:
+            yield chunk
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+@pytest.fixture
+def make_sender():
+    senders = []
+
+    def _make(ws, **kwargs):
+        params = dict(
+            first_chunk_bytes=1000,
+            chunk_bytes=4000,
+            lead_seconds=0.0,
+            max_buffer_bytes=64000,
+            stall_timeout=1.0,
+        )
+        params.update(kwargs)
+        sender = AudioSender(ws, f"test-session-{len(senders)}", **params)
+        senders.append(sender)
+        return sender
+
+    yield _make
+    for sender in senders:
+        sender.close()
+
+
+def _expected_times(start, sizes, rate, lead_bytes=0):
+    times, sent = [], 0
+    for size in sizes:
+        times.append(start + max(0, sent - lead_bytes) / rate)
+        sent += size
+    return times
+
+
+def test_first_chunk_small_then_paced_from_first_send(clock, make_sender):
+    ws = FakeWebSocket()
+    sender = make_sender(ws)
+
+    # 1 s of audio, all delivered at once after a 0.2 s time-to-first-byte
+    sent = run_virtual(
+        clock,
+        lambda: sender.stream(_vendor([b"x" * 40000], delay=0.2), bytes_per_sec=40000),
+    )
+
+    sizes = [size for _, size in ws.sends]
+    assert sent == 40000
+    assert sizes == [1000] + [4000] * 9 + [3000]
+    # The clock starts at the first send (t=0.2), so nothing bursts out.
+    times = [at for at, _ in ws.sends]
+    assert times == pytest.approx(_expected_times(0.2, sizes, 40000))
+
+
+def test_lead_lets_first_bytes_through_unpaced(clock, make_sender):
+    ws = FakeWebSocket()
+    sender = make_sender(ws, lead_seconds=0.1)
+
+    run_virtual(clock, lambda: sender.stream(_vendor([b"x" * 13000]), bytes_per_sec=40000))
+
+    sizes = [size for _, size in ws.sends]
+    times = [at for at, _ in ws.sends]
+    assert times == pytest.approx(_expected_times(0.0, sizes, 40000, lead_bytes=4000))
+    assert times[:2] == [0.0, 0.0]
+
+
+def test_stream_rate_sets_pacing(clock, make_sender):
+    ws = FakeWebSocket()
+    sender = make_sender(ws)
+
+    run_virtual(clock, lambda: sender.stream(_vendor([b"x" * 9000]), bytes_per_sec=10000))
+
+    sizes = [size for _, size in ws.sends]
+    assert [at for at, _ in ws.sends] == pytest.approx(_expected_times(0.0, sizes, 10000))
+    assert ws.sends[-1][0] == pytest.approx(0.5)
+
+
+def test_slow_but_healthy_client_is_not_dropped(clock, make_sender):
+    # The second vendor chunk waits 0.2 s for pacing to drain the buffer –
+    # longer than the stall timeout, but a send lands every 0.1 s.
+    ws = FakeWebSocket()
+    sender = make_sender(
+        ws,
+        first_chunk_bytes=2000,
+        chunk_bytes=2000,
+        max_buffer_bytes=8000,
+        stall_timeout=0.15,
+    )
+
+    sent = run_virtual(
+        clock,
+        lambda: sender.stream(_vendor([b"x" * 8000, b"y" * 8000]), bytes_per_sec=20000),
+    )
+    assert sent == 16000
+    assert ws.sends[-1][0] == pytest.approx(0.7)
+
+
+def test_stalled_client_is_dropped_and_vendor_closed(make_sender):
+    sender = make_sender(FakeWebSocket(hang=True), max_buffer_bytes=8000, stall_timeout=0.05)
+    closed: list = []
+
+    async def run():
+        await sender.stream(_vendor([b"x" * 4000] * 10, closed=closed), bytes_per_sec=40000)
+
+    with pytest.raises(ClientStalledError):
+        asyncio.run(run())
+    assert closed == [True]
+
+
+def test_vendor_closed_when_send_loop_ends_first(make_sender):
+    class FailingWebSocket(FakeWebSocket):
+        async def send_bytes(self, data: bytes):
+            raise RuntimeError("socket gone")
+
+    closed: list = []
+    sender = make_sender(FailingWebSocket())
+
+    async def run():
+        await sender.stream(_vendor([b"x" * 4000] * 5, closed=closed), bytes_per_sec=40000)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+    assert closed == [True]
+
+
+def test_buffer_stats_are_aggregate_only():
+    a = AudioSender(FakeWebSocket(), "secret-a")
+    b = AudioSender(FakeWebSocket(), "secret-b")
+    a._buf.extend(b"x" * 10)
+    b._buf.extend(b"x" * 30)
+    try:
+        stats = buffer_stats()
+    finally:
+        a.close()
+        b.close()
+
+    assert stats == {"sessions": 2, "total_bytes": 40, "max_bytes": 30}
+    assert buffer_stats()["sessions"] == 0
@@ -0,0 +1,89 @@
+"""Tests for STT vendor routing in `app.services.stt`."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.infra import vendor_health
+from app.infra.config import settings
+from app.services import stt
+
+
+def _runner(result=None, *, error=None, delay=0.0, calls=None, name=""):
+    def run(file_path, model):
+        if calls is not None:
+            calls.append(name)
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return run
+
+
+def test_fails_over_to_next_vendor(both_vendors, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        stt, "_sync_run_deepgram", _runner(error=RuntimeError("dg down"), calls=calls, name="dg")
+    )
+    monkeypatch.setattr(stt, "_sync_run_whisper", _runner("hello", calls=calls, name="oa"))
+
+    assert asyncio.run(stt.transcribe_file("x.webm")) == "hello"
+    assert calls == ["dg", "oa"]
+    snap = vendor_health.snapshot()["stt"]
+    assert snap["deepgram"]["consecutive_failures"] == 1
+    assert snap["openai"]["calls"] == 1
+
+
+def test_timeout_counts_as_failure(both_vendors, monkeypatch):
+    monkeypatch.setattr(settings, "stt_timeout", 0.05)
+    monkeypatch.setattr(stt, "_sync_run_deepgram", _runner("late", delay=0.3))
+    monkeypatch.setattr(stt, "_sync_run_whisper", _runner("hello"))
+
+    assert asyncio.run(stt.transcribe_file("x.webm")) == "hello"
+    assert vendor_health.snapshot()["stt"]["deepgram"]["consecutive_failures"] == 1
+
+
+def test_all_open_tries_least_bad_then_raises(both_vendors, monkeypatch, open_breaker):
+    open_breaker("stt", "deepgram")
+    open_breaker("stt", "openai")
+    calls = []
+    boom = RuntimeError("still down")
+    monkeypatch.setattr(stt, "_sync_run_deepgram", _runner(error=boom, calls=calls, name="dg"))
+    monkeypatch.setattr(stt, "_sync_run_whisper", _runner(error=boom, calls=calls, name="oa"))
+
+    with pytest.raises(vendor_health.VendorUnavailableError) as info:
+        asyncio.run(stt.transcribe_file("x.webm"))
+    assert info.value.__cause__ is boom
+    assert len(calls) == 1  # only the forced least-bad vendor
+
+
+def test_all_open_forced_vendor_can_recover(both_vendors, monkeypatch, open_breaker):
+    dg = open_breaker("stt", "deepgram")
+    open_breaker("stt", "openai")
+    monkeypatch.setattr(stt, "_sync_run_deepgram", _runner("from dg"))
+    monkeypatch.setattr(stt, "_sync_run_whisper", _runner("from oa"))
+
+    # Equally bad – the preferred vendor is forced through and closes again.
+    assert asyncio.run(stt.transcribe_file("x.webm")) == "from dg"
+    assert dg.state == vendor_health.CLOSED
+
+
+def test_cancellation_releases_probe(both_vendors, monkeypatch, open_breaker):
+    br = open_breaker("stt", "deepgram")
+    monkeypatch.setattr(settings, "vendor_cooldown", 0.0)
+    monkeypatch.setattr(stt, "_sync_run_deepgram", _runner("late", delay=0.3))
+
+    async def run():
+        task = asyncio.create_task(stt.transcribe_file("x.webm"))
+        await asyncio.sleep(0.05)
+        assert br.state == vendor_health.HALF_OPEN and not br.probe_due()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert br.probe_due()  # probe slot given back, nothing recorded
+    assert br.consecutive_failures == 3
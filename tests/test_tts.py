@@ -0,0 +1,179 @@
+"""Tests for TTS vendor routing in `app.services.tts`."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.infra import vendor_health
+from app.infra.config import settings
+from app.services import tts
+
+
+class FakeStream:
+    """Scripted vendor stream; records whether it was closed."""
+
+    def __init__(self, *chunks, error=None, delay=0.0, gap=0.0):
+        self.chunks = chunks
+        self.error = error
+        self.delay = delay
+        self.gap = gap
+        self.started = False
+        self.closed = False
+
+    def __call__(self, text, **kwargs):
+        return self._gen()
+
+    async def _gen(self):
+        self.started = True
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            for i, chunk in enumerate(self.chunks):
+                if i and self.gap:
+                    await asyncio.sleep(self.gap)
+                yield chunk
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.closed = True
+
+
+def _patch(monkeypatch, *, deepgram, openai):
+    monkeypatch.setattr(tts, "synthesize_stream_deepgram", deepgram)
+    monkeypatch.setattr(tts, "synthesize_stream_openai", openai)
+
+
+def _collect(**kwargs):
+    async def run():
+        return [chunk async for chunk in tts.synthesize_stream("hi", **kwargs)]
+
+    return asyncio.run(run())
+
+
+def _breaker(vendor):
+    return vendor_health.get_breaker("tts", vendor)
+
+
+def test_fails_over_before_audio(both_vendors, monkeypatch):
+    dg = FakeStream(error=RuntimeError("dg down"))
+    oa = FakeStream(b"a", b"b")
+    _patch(monkeypatch, deepgram=dg, openai=oa)
+
+    assert _collect() == [b"a", b"b"]
+    assert dg.closed and oa.closed
+    assert _breaker("deepgram").consecutive_failures == 1
+    assert _breaker("openai").snapshot()["calls"] == 1
+
+
+def test_empty_stream_counts_as_failure(both_vendors, monkeypatch):
+    dg = FakeStream()
+    _patch(monkeypatch, deepgram=dg, openai=FakeStream(b"a"))
+
+    assert _collect() == [b"a"]
+    assert _breaker("deepgram").consecutive_failures == 1
+
+
+def test_first_byte_timeout_closes_abandoned_stream(both_vendors, monkeypatch):
+    monkeypatch.setattr(settings, "tts_first_byte_timeout", 0.05)
+    dg = FakeStream(b"late", delay=1.0)
+    _patch(monkeypatch, deepgram=dg, openai=FakeStream(b"a"))
+
+    assert _collect() == [b"a"]
+    assert dg.closed
+    assert _breaker("deepgram").consecutive_failures == 1
+
+
+def test_last_candidate_gets_chunk_timeout(both_vendors, monkeypatch):
+    monkeypatch.setattr(settings, "use_deepgram", False)
+    monkeypatch.setattr(settings, "tts_first_byte_timeout", 0.01)
+    monkeypatch.setattr(settings, "tts_chunk_timeout", 1.0)
+    _patch(monkeypatch, deepgram=FakeStream(), openai=FakeStream(b"slow", delay=0.1))
+
+    # A slow but working only vendor still answers.
+    assert _collect() == [b"slow"]
+    assert _breaker("openai").state == vendor_health.CLOSED
+
+
+def test_mid_stream_failure_is_recorded(both_vendors, monkeypatch):
+    dg = FakeStream(b"a", b"b", error=RuntimeError("reset"))
+    oa = FakeStream(b"never")
+    _patch(monkeypatch, deepgram=dg, openai=oa)
+
+    assert _collect() == [b"a", b"b"]  # no failover once audio started
+    assert not oa.started
+    assert _breaker("deepgram").consecutive_failures == 1
+
+
+def test_gap_between_chunks_is_bounded(both_vendors, monkeypatch):
+    monkeypatch.setattr(settings, "tts_chunk_timeout", 0.05)
+    dg = FakeStream(b"a", b"b", gap=1.0)
+    _patch(monkeypatch, deepgram=dg, openai=FakeStream(b"never"))
+
+    assert _collect() == [b"a"]
+    assert dg.closed
+    assert _breaker("deepgram").consecutive_failures == 1
+
+
+def test_cancellation_releases_probe(both_vendors, monkeypatch, open_breaker):
+    br = open_breaker("tts", "deepgram")
+    monkeypatch.setattr(settings, "vendor_cooldown", 0.0)
+    dg = FakeStream(b"late", delay=1.0)
+    _patch(monkeypatch, deepgram=dg, openai=FakeStream(b"a"))
+
+    async def run():
+        task = asyncio.create_task(_first_chunk())
+        await asyncio.sleep(0.05)
+        assert br.state == vendor_health.HALF_OPEN and not br.probe_due()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    async def _first_chunk():
+        async for chunk in tts.synthesize_stream("hi"):
+            return chunk
+
+    asyncio.run(run())
+    assert dg.closed
+    assert br.probe_due()  # probe slot given back, nothing recorded
+    assert br.consecutive_failures == 3
+
+
+def test_all_open_forces_least_bad_vendor(both_vendors, monkeypatch, open_breaker):
+    open_breaker("tts", "deepgram")
+    for _ in range(6):
+        _breaker("openai").record_success(0.1)
+    oa_br = open_breaker("tts", "openai")  # 3 of 9 failed vs. 3 of 3
+    _patch(monkeypatch, deepgram=FakeStream(b"dg"), openai=FakeStream(b"oa"))
+
+    assert _collect() == [b"oa"]
+    assert oa_br.state == vendor_health.CLOSED
+
+
+def test_all_vendors_failing_yields_nothing(both_vendors, monkeypatch, open_breaker):
+    open_breaker("tts", "deepgram")
+    open_breaker("tts", "openai")
+    boom = RuntimeError("down")
+    _patch(monkeypatch, deepgram=FakeStream(error=boom), openai=FakeStream(error=boom))
+
+    assert _collect() == []
+
+
+def test_output_format_is_24khz_pcm():
+    fmt = tts.output_format()
+    assert fmt["bytes_per_sec"] == 48000
+    assert fmt["media_type"].startswith("audio/pcm")
+    assert "rate=24000" in fmt["media_type"]
+
+
+def test_tts_stream_endpoint_uses_output_format(both_vendors, monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(settings, "use_deepgram", False)
+    _patch(monkeypatch, deepgram=FakeStream(), openai=FakeStream(b"ab", b"cd"))
+
+    resp = TestClient(app).post("/tts_stream", json={"text": "hello"})
+    assert resp.status_code == 200
+    assert resp.content == b"abcd"
+    assert resp.headers["content-type"] == tts.output_format()["media_type"]
+    assert "reply.pcm" in resp.headers["content-disposition"]
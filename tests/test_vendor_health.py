@@ -0,0 +1,232 @@
+"""Tests for the STT/TTS vendor circuit breakers."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.infra import vendor_health
+from app.infra.config import settings
+from app.infra.vendor_health import CLOSED, HALF_OPEN, OPEN
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(vendor_health, "time", SimpleNamespace(monotonic=clock))
+    monkeypatch.setattr(vendor_health, "_BREAKERS", {})
+    monkeypatch.setattr(settings, "vendor_window", 20)
+    monkeypatch.setattr(settings, "vendor_min_calls", 5)
+    monkeypatch.setattr(settings, "vendor_failure_ratio", 0.5)
+    monkeypatch.setattr(settings, "vendor_max_consecutive_failures", 3)
+    monkeypatch.setattr(settings, "vendor_cooldown", 30.0)
+    monkeypatch.setattr(settings, "vendor_sample_ttl", 300.0)
+    monkeypatch.setattr(settings, "vendor_explore_ratio", 0.0)
+    return clock
+
+
+def _record(kind, vendor, *latencies):
+    """Record calls on a breaker; `None` stands for a failed call."""
+
+    br = vendor_health.get_breaker(kind, vendor)
+    for latency in latencies:
+        if latency is None:
+            br.record_failure()
+        else:
+            br.record_success(latency)
+    return br
+
+
+def _order(kind="stt", vendors=("deepgram", "openai"), **kwargs):
+    return [br.vendor for br in vendor_health.route(kind, list(vendors), **kwargs)]
+
+
+def _open(br):
+    for _ in range(settings.vendor_max_consecutive_failures):
+        assert br.acquire()
+        br.record_failure()
+    assert br.state == OPEN
+
+
+# ---------------------------------------------------------------------------
+# CircuitBreaker
+# ---------------------------------------------------------------------------
+def test_opens_after_consecutive_failures(clock):
+    br = _record("stt", "openai", None, None)
+    assert br.state == CLOSED
+    _record("stt", "openai", None)
+    assert br.state == OPEN
+    assert not br.acquire()
+
+
+def test_half_open_probe_closes_on_success(clock):
+    br = vendor_health.get_breaker("tts", "openai", slow_seconds=1.0)
+    _open(br)
+
+    clock.now += 29
+    assert not br.acquire()
+    clock.now += 1
+    assert br.acquire()
+    assert br.state == HALF_OPEN
+    assert not br.acquire()  # only one probe in flight
+
+    br.record_success(0.2)
+    assert br.state == CLOSED
+    assert br.snapshot()["calls"] == 1  # window reset on recovery
+    assert br.snapshot()["p90_latency"] == 0.2
+
+
+@pytest.mark.parametrize("outcome", ["failure", "slow"])
+def test_half_open_probe_reopens(clock, outcome):
+    br = vendor_health.get_breaker("tts", "openai", slow_seconds=1.0)
+    _open(br)
+    clock.now += 30
+    assert br.acquire()
+
+    if outcome == "failure":
+        br.record_failure()
+    else:
+        br.record_success(2.0)
+    assert br.state == OPEN
+    assert not br.acquire()  # cooldown restarts
+    clock.now += 30
+    assert br.acquire()
+
+
+def test_release_frees_probe_slot(clock):
+    br = vendor_health.get_breaker("stt", "openai")
+    _open(br)
+    clock.now += 30
+    assert br.acquire()
+    br.release()
+    assert br.acquire()
+
+
+def test_force_admits_open_breaker(clock):
+    br = vendor_health.get_breaker("stt", "openai")
+    _open(br)
+    assert not br.acquire()
+    assert br.acquire(force=True)
+    br.record_success(0.1)
+    assert br.state == CLOSED
+
+
+def test_score_counts_failures_and_expires_samples(clock):
+    br = _record("stt", "openai", 0.5, None)
+    assert br.score == float("inf")
+
+    clock.now += 301
+    assert br.score == float("inf")  # nothing recent
+    assert br.snapshot()["calls"] == 0
+    _record("stt", "openai", 0.4)
+    assert br.score == 0.4
+
+
+# ---------------------------------------------------------------------------
+# route() / candidates()
+# ---------------------------------------------------------------------------
+def test_slow_calls_open_only_with_threshold_and_alternative(clock):
+    vendor_health.route("tts", ["deepgram", "openai"], slow_seconds=1.0)
+    vendor_health.route("stt", ["deepgram", "openai"])
+    tts = _record("tts", "deepgram", *[3.0] * 5)
+    stt = _record("stt", "deepgram", *[30.0] * 5)
+    assert tts.state == OPEN
+    assert stt.state == CLOSED
+
+
+def test_slowness_never_opens_only_vendor(clock):
+    vendor_health.route("tts", ["openai"], slow_seconds=1.0)
+    br = _record("tts", "openai", *[3.0] * 10)
+    assert br.state == CLOSED
+
+
+def test_route_keeps_preference_for_unmeasured(clock):
+    assert _order() == ["deepgram", "openai"]
+    assert _order() == ["deepgram", "openai"]  # no exploration of unused vendors
+
+
+def test_route_prefers_fastest_measured(clock):
+    _record("stt", "deepgram", 2.0)
+    _record("stt", "openai", 0.5)
+    assert _order() == ["openai", "deepgram"]
+
+
+def test_route_puts_measured_before_unmeasured(clock):
+    _record("stt", "openai", 5.0)
+    assert _order() == ["openai", "deepgram"]
+
+
+def test_route_demotes_failed_vendor(clock):
+    _record("stt", "deepgram", 0.1, None)
+    _record("stt", "openai", 0.5)
+    assert _order() == ["openai", "deepgram"]
+
+
+def test_route_explores_vendor_that_fell_behind(clock, monkeypatch):
+    _record("stt", "deepgram", None)
+    _record("stt", "openai", 0.5)
+    monkeypatch.setattr(settings, "vendor_explore_ratio", 1.0)
+    assert _order() == ["deepgram", "openai"]
+
+    # A good measurement wins the vendor its place back.
+    _record("stt", "deepgram", *[0.1] * 10)
+    monkeypatch.setattr(settings, "vendor_explore_ratio", 0.0)
+    assert _order() == ["deepgram", "openai"]
+
+
+def test_explore_never_picks_unused_vendor(clock, monkeypatch):
+    _record("stt", "deepgram", 0.5)
+    monkeypatch.setattr(settings, "vendor_explore_ratio", 1.0)
+    assert _order() == ["deepgram", "openai"]
+
+
+def test_route_skips_open_and_puts_due_probe_first(clock):
+    dg = vendor_health.get_breaker("stt", "deepgram")
+    _record("stt", "openai", 0.5)
+    _open(dg)
+    assert _order() == ["openai"]
+
+    clock.now += 30
+    assert _order() == ["deepgram", "openai"]
+
+
+def test_candidates_marks_last_and_acquires(clock):
+    got = list(vendor_health.candidates("stt", ["deepgram", "openai"]))
+    assert [(br.vendor, last) for br, last in got] == [
+        ("deepgram", False),
+        ("openai", True),
+    ]
+
+
+def test_candidates_forces_least_bad_when_all_open(clock):
+    dg = vendor_health.get_breaker("stt", "deepgram")
+    oa = vendor_health.get_breaker("stt", "openai")
+    _record("stt", "openai", *[0.2] * 6)
+    _open(dg)
+    _open(oa)  # 3 failures out of 9 – less bad than deepgram
+
+    got = list(vendor_health.candidates("stt", ["deepgram", "openai"]))
+    assert [(br.vendor, last) for br, last in got] == [("openai", True)]
+    assert oa.state == HALF_OPEN
+
+
+@pytest.mark.parametrize(
+    "use_deepgram, key, expected",
+    [
+        (False, "", ["openai"]),
+        (False, "dg-key", ["openai"]),
+        (True, "", ["openai"]),
+        (True, "dg-key", ["deepgram", "openai"]),
+    ],
+)
+def test_available_vendors_respects_opt_in(monkeypatch, use_deepgram, key, expected):
+    monkeypatch.setattr(settings, "use_deepgram", use_deepgram)
+    monkeypatch.setattr(settings, "deepgram_api_key", key)
+    assert vendor_health.available_vendors() == expected